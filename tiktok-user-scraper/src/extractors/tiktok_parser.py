@@ -1,21 +1,56 @@
-import json
+import functools
 import logging
 import re
-from dataclasses import dataclass, asdict, field
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Any, Dict, Optional, Tuple
 
-from bs4 import BeautifulSoup  # type: ignore
+import orjson  # type: ignore
+from bs4 import BeautifulSoup, FeatureNotFound  # type: ignore
 
 from extractors.utils_network import fetch_html  # type: ignore
 
 logger = logging.getLogger("tiktok_parser")
 
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+# Anchored on both sides so long digit runs are not re-scanned from every offset.
 PHONE_RE = re.compile(
-    r"(\+?\d[\d\s\-]{7,}\d)"
+    r"(?:^|[^\d+])(\+?\d[\d\s\-]{7,}\d)(?!\d)"
 )  # naive pattern; enough for detecting presence
+USERNAME_RE = re.compile(r"/@([^/]+)")
+# Matches a whole OG <meta> tag, whatever the attribute order; the content
+# value is then read from the tag with OG_CONTENT_RE.
+OG_META_RE = re.compile(
+    r"<meta\b[^>]*?\sproperty=[\"']og:(title|description|image)[\"'][^>]*>",
+    re.IGNORECASE,
+)
+OG_CONTENT_RE = re.compile(r"\scontent=([\"'])(.*?)\1", re.IGNORECASE | re.DOTALL)
+OG_NAMES = ("title", "description", "image")
+OG_TITLE_RE = re.compile(r"(.+?)\s+\(@(.+?)\)")
+# OG tags live in <head>, so only the top of the document is scanned for them.
+OG_SCAN_LIMIT = 65536
+SIGI_RE = re.compile(
+    r"<script[^>]+id=[\"']SIGI_STATE[\"'][^>]*>(.*?)</script>", re.DOTALL
+)
+SIGI_USER_KEYS = ('"UserModule"', '"UserPage"')
+
+class _DigitFilter(dict):
+    """
+    str.translate table that keeps decimal digits and deletes everything else.
+
+    Entries are filled in lazily on first sight of each character, so the
+    table stays small while still covering non-ASCII digits like the
+    ``[^\\d]`` regex it replaces.
+    """
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = codepoint if chr(codepoint).isdecimal() else None
+        self[codepoint] = value
+        return value
+
+DIGITS_ONLY = _DigitFilter()
 
-@dataclass
+@dataclass(slots=True)
 class TikTokUser:
     id: str = ""
     url: str = ""
@@ -36,12 +71,31 @@ class TikTokUser:
     extra: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
-        data = asdict(self)
+        # Built by hand rather than with asdict(), which deep-copies every field.
+        data = {
+            "id": self.id,
+            "url": self.url,
+            "username": self.username,
+            "nickname": self.nickname,
+            "bio": self.bio,
+            "followers": self.followers,
+            "following": self.following,
+            "likes": self.likes,
+            "videos": self.videos,
+            "verified": self.verified,
+            "avatar": self.avatar,
+            "region": self.region,
+            "language": self.language,
+            "hasEmail": self.hasEmail,
+            "hasPhone": self.hasPhone,
+            "coverImage": self.coverImage,
+        }
         # Merge "extra" fields into the top-level dictionary
-        extra = data.pop("extra", {}) or {}
-        data.update(extra)
+        if self.extra:
+            data.update(self.extra)
         return data
 
+@functools.lru_cache(maxsize=4096)
 def _extract_username_from_url(url: str) -> str:
     """
     Extracts username from TikTok profile or video URL.
@@ -59,17 +113,38 @@ def _extract_username_from_url(url: str) -> str:
     url = url.split("?", 1)[0].split("#", 1)[0]
 
     # Look for @username segment
-    match = re.search(r"/@([^/]+)/?", url)
+    match = USERNAME_RE.search(url)
     if match:
         return match.group(1)
 
     return ""
 
+def profile_url_for(url: str) -> str:
+    """
+    Returns the canonical profile URL for a TikTok profile or video URL, so
+    every URL of the same author maps to a single page. URLs without an
+    @username segment are returned unchanged.
+
+    Examples:
+    - https://www.tiktok.com/@username/video/123456 -> https://www.tiktok.com/@username
+    """
+    username = _extract_username_from_url(url)
+    if not username:
+        return url
+    return f"{url.split('/@', 1)[0]}/@{username}"
+
 def _detect_contacts(bio: str) -> Tuple[bool, bool]:
     if not bio:
         return False, False
-    has_email = EMAIL_RE.search(bio) is not None
-    has_phone = PHONE_RE.search(bio) is not None
+
+    # Cheap C-level pre-checks: no "@" means no email, no digit means no
+    # phone, and most bios rule out at least one of the two.
+    maybe_email = "@" in bio
+    maybe_phone = bool(bio.translate(DIGITS_ONLY))
+    # Searched independently: email and phone matches may overlap (e.g. a
+    # number used as the local part of an address) and both must count.
+    has_email = maybe_email and EMAIL_RE.search(bio) is not None
+    has_phone = maybe_phone and PHONE_RE.search(bio) is not None
     return has_email, has_phone
 
 def _safe_int(value: Any, default: int = 0) -> int:
@@ -80,32 +155,49 @@ def _safe_int(value: Any, default: int = 0) -> int:
             return int(value)
         if isinstance(value, str):
             # Remove commas and other formatting
-            cleaned = re.sub(r"[^\d]", "", value)
+            cleaned = value.translate(DIGITS_ONLY)
             return int(cleaned) if cleaned else default
         return default
     except Exception:
         return default
 
-def _deep_get(data: Dict[str, Any], path: List[str], default: Any = None) -> Any:
-    node: Any = data
-    for key in path:
-        if not isinstance(node, dict) or key not in node:
-            return default
-        node = node[key]
-    return node
+def _make_soup(html: str) -> BeautifulSoup:
+    """
+    Build a BeautifulSoup tree using the fast lxml parser when it is installed,
+    falling back to the pure-Python html.parser otherwise.
+    """
+    try:
+        return BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser")
 
 def _parse_from_sigi_state(html: str) -> Dict[str, Any]:
     """
     TikTok embeds structured data in a script tag with id="SIGI_STATE".
     This helper returns that JSON object if present.
+
+    The script blob is sliced straight out of the raw HTML; a full DOM is only
+    built when the regex misses (e.g. unusual attribute quoting).
     """
-    soup = BeautifulSoup(html, "html.parser")
-    script = soup.find("script", id="SIGI_STATE")
-    if not script or not script.string:
+    match = SIGI_RE.search(html)
+    if match:
+        payload = match.group(1)
+    elif "SIGI_STATE" not in html:
+        # Nothing to find; don't build a DOM just to confirm that.
+        return {}
+    else:
+        script = _make_soup(html).find("script", id="SIGI_STATE")
+        # orjson only accepts exact str, not bs4's NavigableString subclass.
+        payload = str(script.string) if script and script.string else None
+    if not payload:
+        return {}
+    # Only the user modules are read from this (often several hundred KB) blob;
+    # when neither key appears anywhere in it, decoding would be wasted work.
+    if not any(key in payload for key in SIGI_USER_KEYS):
         return {}
 
     try:
-        return json.loads(script.string)
+        return orjson.loads(payload)
     except Exception as exc:
         logger.debug("Failed to parse SIGI_STATE JSON: %s", exc)
         return {}
@@ -115,19 +207,25 @@ def _select_primary_user(data: Dict[str, Any]) -> Dict[str, Any]:
     Given a parsed SIGI_STATE-like dict, try to pick the most relevant user dictionary.
     """
     # Newer TikTok layouts often expose user data under UserModule.users
-    users = _deep_get(data, ["UserModule", "users"], {})
+    # Each level is type-checked: SIGI_STATE is untrusted page content.
+    user_module = data.get("UserModule")
+    if not isinstance(user_module, dict):
+        user_module = {}
+    users = user_module.get("users")
     if isinstance(users, dict) and users:
         # Pick the first user entry
         first_key = next(iter(users))
         user = users.get(first_key, {})
-        stats = _deep_get(data, ["UserModule", "stats", first_key], {})
+        stats = user_module.get("stats")
+        stats = stats.get(first_key, {}) if isinstance(stats, dict) else {}
         merged = dict(user)
         if isinstance(stats, dict):
             merged.setdefault("stats", stats)
         return merged
 
     # Fallback: try UserPage.userInfo
-    user_info = _deep_get(data, ["UserPage", "userInfo"], {})
+    user_page = data.get("UserPage")
+    user_info = user_page.get("userInfo", {}) if isinstance(user_page, dict) else {}
     if isinstance(user_info, dict):
         return user_info
 
@@ -135,7 +233,7 @@ def _select_primary_user(data: Dict[str, Any]) -> Dict[str, Any]:
 
 def _parse_user_from_structured_json(url: str, html: str) -> Optional[TikTokUser]:
     sigi_state = _parse_from_sigi_state(html)
-    if not sigi_state:
+    if not sigi_state or not isinstance(sigi_state, dict):
         return None
 
     user_data = _select_primary_user(sigi_state)
@@ -188,10 +286,11 @@ def _parse_user_from_structured_json(url: str, html: str) -> Optional[TikTokUser
         or stats.get("video")
     )
 
+    user_page = sigi_state.get("UserPage")
     uid = str(
         user_info.get("id")
         or user_info.get("uid")
-        or _deep_get(sigi_state, ["UserPage", "uniqueId"], "")
+        or (user_page.get("uniqueId", "") if isinstance(user_page, dict) else "")
     )
 
     verified = bool(user_info.get("verified") or user_info.get("badgeVerification"))
@@ -217,27 +316,47 @@ def _parse_user_from_structured_json(url: str, html: str) -> Optional[TikTokUser
         coverImage=cover_image,
     )
 
-def _parse_from_open_graph(url: str, html: str) -> Optional[TikTokUser]:
-    """
-    Basic fallback using OpenGraph meta tags and title when structured JSON is unavailable.
+def _read_open_graph(html: str) -> Dict[str, str]:
     """
-    soup = BeautifulSoup(html, "html.parser")
+    Collect the og:title/description/image values from the page head.
 
-    def og(name: str) -> str:
+    OG tags have a very regular shape, so a regex scan over the top of the
+    document is usually enough. BeautifulSoup is only used for tags the scan
+    missed but which do appear somewhere in the page.
+    """
+    tags: Dict[str, str] = {}
+    for match in OG_META_RE.finditer(html, 0, OG_SCAN_LIMIT):
+        content = OG_CONTENT_RE.search(match.group(0))
+        if content:
+            tags.setdefault(match.group(1).lower(), unescape(content.group(2)))
+
+    missing = [
+        name for name in OG_NAMES if name not in tags and f"og:{name}" in html
+    ]
+    if not missing:
+        return tags
+
+    soup = _make_soup(html)
+    for name in missing:
         tag = soup.find("meta", attrs={"property": f"og:{name}"})
         if tag and tag.get("content"):
-            return str(tag["content"])
-        return ""
+            tags[name] = str(tag["content"])
+    return tags
 
-    title = og("title")
-    description = og("description")
-    image = og("image")
+def _parse_from_open_graph(url: str, html: str) -> Optional[TikTokUser]:
+    """
+    Basic fallback using OpenGraph meta tags and title when structured JSON is unavailable.
+    """
+    tags = _read_open_graph(html)
+    title = tags.get("title", "")
+    description = tags.get("description", "")
+    image = tags.get("image", "")
 
     # Often the title looks like: "nickname (@username) | TikTok"
     username = _extract_username_from_url(url)
     nickname = ""
     if title:
-        m = re.match(r"(.+?)\s+\(@(.+?)\)", title)
+        m = OG_TITLE_RE.match(title)
         if m:
             nickname = m.group(1).strip()
             if not username:
@@ -259,28 +378,13 @@ def _parse_from_open_graph(url: str, html: str) -> Optional[TikTokUser]:
         hasPhone=has_phone,
     )
 
-def parse_user_from_url(
-    url: str,
-    session: Any,
-    timeout: int = 10,
-    retries: int = 1,
-) -> Optional[TikTokUser]:
+def parse_user_from_html(url: str, html: str) -> TikTokUser:
     """
-    High-level API used by the runner.
+    Turn already-fetched HTML for a profile or video URL into a TikTokUser.
 
-    Attempts to fetch a TikTok profile or video URL, extract the author's profile,
-    and return a TikTokUser object. It is resilient and will fall back to
-    minimal parsing when full structured data isn't available.
+    Pure CPU work with no network access, so callers can run it separately
+    from the fetch (e.g. on the main thread while workers keep downloading).
     """
-    logger.info("Processing URL: %s", url)
-
-    html = fetch_html(
-        url=url,
-        session=session,
-        timeout=timeout,
-        retries=retries,
-    )
-
     if not html:
         logger.warning("No HTML returned for %s", url)
         # Best-effort minimal object using just URL and username
@@ -288,10 +392,6 @@ def parse_user_from_url(
         return TikTokUser(id="", url=url, username=username)
 
     # First try to parse the embedded JSON state
-    user = _parse_from_sigi_state(html)
-    if isinstance(user, TikTokUser):
-        return user
-
     structured_user = _parse_user_from_structured_json(url, html)
     if structured_user:
         return structured_user
@@ -304,4 +404,29 @@ def parse_user_from_url(
     # Final fallback: very minimal user object
     username = _extract_username_from_url(url)
     logger.debug("Falling back to minimal user for %s", url)
-    return TikTokUser(id="", url=url, username=username)
\ No newline at end of file
+    return TikTokUser(id="", url=url, username=username)
+
+def parse_user_from_url(
+    url: str,
+    session: Any = None,
+    timeout: int = 10,
+    retries: int = 1,
+) -> Optional[TikTokUser]:
+    """
+    High-level single-URL API.
+
+    Attempts to fetch a TikTok profile or video URL, extract the author's profile,
+    and return a TikTokUser object. It is resilient and will fall back to
+    minimal parsing when full structured data isn't available. Without an
+    explicit session the process-wide shared connection pool is used, and
+    ``retries`` is ignored if that pool already exists.
+    """
+    logger.info("Processing URL: %s", url)
+
+    html = fetch_html(
+        url=url,
+        session=session,
+        timeout=timeout,
+        retries=retries,
+    )
+    return parse_user_from_html(url, html)
@@ -1,9 +1,12 @@
 import logging
 import random
-import time
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Optional, Union
 
 import requests  # type: ignore
+import urllib3  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.util.retry import Retry  # type: ignore
 
 logger = logging.getLogger("network")
 
@@ -22,69 +25,152 @@ USER_AGENTS = [
     "Gecko/20100101 Firefox/123.0",
 ]
 
-def create_http_session() -> requests.Session:
+# Statuses worth retrying: rate limiting and transient server-side failures.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Redirects are tracked separately from retries so a plain redirect never
+# counts against the configured retry budget.
+REDIRECT_LIMIT = 10
+
+def _default_headers() -> Dict[str, str]:
+    return {
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept": "text/html,application/xhtml+xml,application/xml;"
+        "q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+        # Brotli is decoded transparently when the brotli package is installed.
+        "Accept-Encoding": "gzip, deflate, br",
+        "Connection": "keep-alive",
+    }
+
+def _retry_policy(retries: int) -> Retry:
+    # ``retries`` counts total attempts (as in the config file), so the first
+    # request is not a retry.
+    extra = max(retries - 1, 0)
+    return Retry(
+        total=None,
+        connect=extra,
+        read=extra,
+        status=extra,
+        other=extra,
+        redirect=REDIRECT_LIMIT,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+        # urllib3 drops Cookie on cross-host redirects by default, which would
+        # lose tt_webid_v2 on e.g. tiktok.com -> www.tiktok.com.
+        remove_headers_on_redirect=("Authorization", "Proxy-Authorization"),
+    )
+
+def create_http_session(max_workers: int = 5, retries: int = 1) -> requests.Session:
     """
     Create a pre-configured requests.Session with headers tuned for TikTok scraping.
+
+    The connection pool is sized for ``max_workers`` concurrent threads and
+    ``retries`` (total attempts, as in the config file) is handled by urllib3
+    with exponential backoff.
     """
     session = requests.Session()
-    session.headers.update(
-        {
-            "User-Agent": random.choice(USER_AGENTS),
-            "Accept": "text/html,application/xhtml+xml,application/xml;"
-            "q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Connection": "keep-alive",
-        }
+    session.headers.update(_default_headers())
+    adapter = HTTPAdapter(
+        pool_connections=max_workers,
+        pool_maxsize=max_workers * 2,
+        max_retries=_retry_policy(retries),
     )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     # TikTok may require basic cookies to serve a standard HTML page.
     session.cookies.set("tt_webid_v2", "1")
     return session
 
+def create_pool_manager(max_workers: int = 5, retries: int = 1) -> urllib3.PoolManager:
+    """
+    Create a urllib3.PoolManager with the same headers, cookie and retry policy
+    as create_http_session.
+
+    Fetching through urllib3 directly skips the per-request work requests adds
+    on top of it (PreparedRequest, hooks, cookie jar, history), which is pure
+    overhead for plain GETs against a single host.
+
+    Unlike a requests.Session there is no cookie jar: only the fixed
+    tt_webid_v2 cookie is sent, and Set-Cookie values from responses are not
+    kept between requests.
+    """
+    headers = _default_headers()
+    # TikTok may require basic cookies to serve a standard HTML page.
+    headers["Cookie"] = "tt_webid_v2=1"
+    return urllib3.PoolManager(
+        num_pools=max_workers,
+        maxsize=max_workers * 2,
+        headers=headers,
+        retries=_retry_policy(retries),
+    )
+
+# Process-wide pool, created by the first get_shared_pool() call.
+_POOL: Optional[urllib3.PoolManager] = None
+_POOL_LOCK = threading.Lock()
+
+def get_shared_pool(max_workers: int = 5, retries: int = 1) -> urllib3.PoolManager:
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    Reusing one pool keeps its keep-alive connections (and their TLS
+    handshakes) shared by every fetch instead of rebuilding them per caller.
+    ``max_workers`` and ``retries`` only take effect on the call that creates
+    the pool; later calls return it unchanged whatever they pass.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = create_pool_manager(max_workers=max_workers, retries=retries)
+    return _POOL
+
 def fetch_html(
     url: str,
-    session: Optional[requests.Session] = None,
+    session: Optional[Union[requests.Session, urllib3.PoolManager]] = None,
     timeout: int = 10,
     retries: int = 1,
 ) -> str:
     """
-    Fetch raw HTML for a given URL with simple retry logic.
+    Fetch raw HTML for a given URL.
 
+    ``session`` may be a urllib3.PoolManager (see create_pool_manager) or a
+    requests.Session (see create_http_session). Retries are performed by
+    urllib3 in both cases. When no session is given the shared pool is used;
+    ``retries`` then only configures it if this call is the one creating it,
+    and is ignored once the pool exists.
     Returns an empty string if the request fails after all retries.
     """
     if session is None:
-        session = create_http_session()
-
-    last_error: Optional[Exception] = None
-
-    for attempt in range(1, retries + 1):
-        try:
-            logger.debug("Fetching URL (attempt %d/%d): %s", attempt, retries, url)
-            resp = session.get(url, timeout=timeout)
-            if resp.status_code >= 400:
-                logger.warning(
-                    "Received HTTP %s for %s", resp.status_code, url
-                )
-            resp.raise_for_status()
-            # TikTok returns compressed HTML, but requests handles decompression for us.
-            logger.debug(
-                "Fetched %d bytes from %s", len(resp.content or b""), url
-            )
-            return resp.text
-        except Exception as exc:
-            last_error = exc
-            logger.warning(
-                "Error fetching %s (attempt %d/%d): %s",
-                url,
-                attempt,
-                retries,
-                exc,
-            )
-            # Basic backoff to be a bit nicer to TikTok.
-            time.sleep(min(2 * attempt, 10))
-
-    if last_error:
-        logger.error("All retries failed for %s: %s", url, last_error)
-    return ""
+        session = get_shared_pool(retries=retries)
+
+    try:
+        logger.debug("Fetching URL: %s", url)
+        if isinstance(session, requests.Session):
+            return _fetch_with_requests(url, session, timeout)
+        resp = session.request("GET", url, timeout=timeout)
+        if resp.status >= 400:
+            logger.warning("Received HTTP %s for %s", resp.status, url)
+            return ""
+        # urllib3 decompresses gzip/br bodies for us.
+        logger.debug("Fetched %d bytes from %s", len(resp.data), url)
+        return resp.data.decode("utf-8", errors="replace")
+    except Exception as exc:
+        logger.error("All retries failed for %s: %s", url, exc)
+        return ""
+
+def _fetch_with_requests(url: str, session: requests.Session, timeout: int) -> str:
+    resp = session.get(url, timeout=timeout)
+    if resp.status_code >= 400:
+        logger.warning(
+            "Received HTTP %s for %s", resp.status_code, url
+        )
+    resp.raise_for_status()
+    # TikTok returns compressed HTML, but requests handles decompression for us.
+    logger.debug(
+        "Fetched %d bytes from %s", len(resp.content or b""), url
+    )
+    return resp.text
 
 def build_query_params(base: Dict[str, Any], extras: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
@@ -2,8 +2,11 @@ import csv
 import json
 import logging
 import os
-from dataclasses import asdict, is_dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+import orjson  # type: ignore
 
 logger = logging.getLogger("exporters")
 
@@ -12,58 +15,115 @@ def _ensure_dir(path: str) -> None:
     if directory and not os.path.exists(directory):
         os.makedirs(directory, exist_ok=True)
 
+@contextmanager
+def _atomic_open(path: str, mode: str, **kwargs: Any) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file next to ``path`` and move it into place only once
+    writing finished without error, so a failed or interrupted export never
+    truncates the previous output or leaves a half-written file behind.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
 def _normalize_record(record: Any) -> Dict[str, Any]:
     if isinstance(record, dict):
         return record
     if is_dataclass(record):
-        return asdict(record)
+        # Shallow copy: asdict() would recursively deep-copy every field.
+        return {f.name: getattr(record, f.name) for f in fields(record)}
     # Fallback: try to use __dict__
     if hasattr(record, "__dict__"):
         return dict(record.__dict__)
     raise TypeError(f"Unsupported record type: {type(record)!r}")
 
-def export_to_json(records: Iterable[Any], output_path: str) -> None:
-    _ensure_dir(output_path)
-    normalized: List[Dict[str, Any]] = [_normalize_record(r) for r in records]
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(normalized, f, ensure_ascii=False, indent=2)
+def _dump_json_record(record: Any) -> Optional[bytes]:
+    """
+    Serialize one record with a 2-space indent, or return None if it can't be.
 
-    logger.info("Exported %d records to JSON at %s", len(normalized), output_path)
+    orjson rejects some values the stdlib accepts (e.g. integers beyond 64
+    bits, which _safe_int can produce from long digit strings), so those
+    records go through json instead of failing the whole export.
+    """
+    normalized = _normalize_record(record)
+    try:
+        return orjson.dumps(
+            normalized, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    except TypeError:
+        pass
+    try:
+        return json.dumps(normalized, ensure_ascii=False, indent=2).encode("utf-8")
+    except (TypeError, ValueError) as exc:
+        logger.error("Skipping record that cannot be serialized to JSON: %s", exc)
+        return None
+
+def export_to_json(records: Iterable[Any], output_path: str) -> int:
+    """
+    Stream records to a JSON array one at a time, so peak memory stays at a
+    single serialized record even when ``records`` is a generator.
 
-def export_to_csv(records: Iterable[Any], output_path: str) -> None:
+    The output is byte-for-byte what dumping the whole list with a 2-space
+    indent would produce.
+    """
+    _ensure_dir(output_path)
+    count = 0
+
+    # orjson always emits UTF-8 bytes, so write them straight to a binary file.
+    with _atomic_open(output_path, "wb") as f:
+        f.write(b"[")
+        for record in records:
+            data = _dump_json_record(record)
+            if data is None:
+                continue
+            f.write(b",\n  " if count else b"\n  ")
+            # Re-indent the record one level to sit inside the top-level array.
+            # JSON escapes newlines inside strings, so only layout is touched.
+            f.write(data.replace(b"\n", b"\n  "))
+            count += 1
+        f.write(b"\n]" if count else b"]")
+
+    logger.info("Exported %d records to JSON at %s", count, output_path)
+    return count
+
+def export_to_csv(records: Iterable[Any], output_path: str) -> int:
     _ensure_dir(output_path)
     normalized: List[Dict[str, Any]] = [_normalize_record(r) for r in records]
 
     if not normalized:
         # Create an empty file with no rows but still valid CSV
-        with open(output_path, "w", newline="", encoding="utf-8") as f:
+        with _atomic_open(output_path, "w", newline="", encoding="utf-8") as f:
             f.write("")
         logger.info("No records to export. Created empty CSV at %s", output_path)
-        return
+        return 0
 
     # Collect all fieldnames across records for a robust CSV header
-    fieldnames: List[str] = []
-    for rec in normalized:
-        for key in rec.keys():
-            if key not in fieldnames:
-                fieldnames.append(key)
-
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for rec in normalized:
-            writer.writerow(rec)
+    # (a dict doubles as an insertion-ordered set).
+    fieldnames: List[str] = list({key: None for rec in normalized for key in rec})
+
+    with _atomic_open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(
+            [rec.get(key, "") for key in fieldnames] for rec in normalized
+        )
 
     logger.info("Exported %d records to CSV at %s", len(normalized), output_path)
+    return len(normalized)
 
 def export_data(
     records: Iterable[Any],
     output_path: str,
     output_format: Optional[str] = None,
-) -> None:
+) -> int:
     """
-    High-level export API.
+    High-level export API. Returns the number of records written.
 
     - If output_format is provided ("json" or "csv"), that takes priority.
     - Otherwise the file extension is inspected to decide the format.
@@ -82,8 +142,8 @@ def export_data(
     )
 
     if output_format == "json":
-        export_to_json(records, output_path)
+        return export_to_json(records, output_path)
     elif output_format == "csv":
-        export_to_csv(records, output_path)
+        return export_to_csv(records, output_path)
     else:
         raise ValueError(f"Unsupported output format: {output_format}")
\ No newline at end of file
@@ -1,18 +1,31 @@
 import argparse
 import json
 import logging
+import math
+import multiprocessing
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Ensure local src directory is importable when running as a script
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 if CURRENT_DIR not in sys.path:
     sys.path.insert(0, CURRENT_DIR)
 
-from extractors.tiktok_parser import TikTokUser, parse_user_from_url  # type: ignore
-from extractors.utils_network import create_http_session  # type: ignore
+from extractors.tiktok_parser import (  # type: ignore
+    TikTokUser,
+    parse_user_from_html,
+    profile_url_for,
+)
+from extractors.utils_network import create_pool_manager, fetch_html  # type: ignore
 from outputs.exporters import export_data  # type: ignore
 
 DEFAULT_CONFIG_PATH = os.path.join(CURRENT_DIR, "config", "settings.example.json")
@@ -20,6 +33,10 @@ PROJECT_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
 DEFAULT_INPUT_PATH = os.path.join(PROJECT_ROOT, "data", "inputs.sample.txt")
 DEFAULT_OUTPUT_PATH = os.path.join(PROJECT_ROOT, "data", "sample_output.json")
 
+# Upper bound on pages shipped to a parse process per task; batching amortizes
+# the pickling/IPC cost without stalling the pipeline behind slow fetches.
+PARSE_BATCH_SIZE = 16
+
 def setup_logging(verbose: bool = False) -> None:
     level = logging.DEBUG if verbose else logging.INFO
     logging.basicConfig(
@@ -58,57 +75,199 @@ def load_inputs(path: str) -> List[str]:
         logger.error("Input file '%s' does not exist.", path)
         return []
 
-    urls: List[str] = []
     with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            stripped = line.strip()
-            if not stripped or stripped.startswith("#"):
-                continue
-            urls.append(stripped)
+        lines = f.read().splitlines()
+
+    # dict.fromkeys drops duplicate URLs while keeping their first-seen order.
+    urls: List[str] = list(
+        dict.fromkeys(
+            stripped
+            for stripped in map(str.strip, lines)
+            if stripped and not stripped.startswith("#")
+        )
+    )
 
     logger.info("Loaded %d input URLs from %s", len(urls), path)
     return urls
 
-def scrape_users(
+def _parse_batch(pages: List[Tuple[str, str]]) -> List[Optional[TikTokUser]]:
+    """
+    Parse a batch of (url, html) pages. Runs inside a worker process.
+    """
+    logger = logging.getLogger("scraper")
+    users: List[Optional[TikTokUser]] = []
+    for url, html in pages:
+        try:
+            users.append(parse_user_from_html(url, html))
+        except Exception as exc:
+            logger.error("Unexpected error while scraping %s: %s", url, exc)
+            users.append(None)
+    return users
+
+def _parse_context() -> multiprocessing.context.BaseContext:
+    # Parse workers are started while fetch threads are running, and forking a
+    # multi-threaded process can deadlock, so never use the "fork" method.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+def _submit_parse(
+    cpu: Optional[ProcessPoolExecutor],
+    batch: List[Tuple[str, str]],
+) -> Future:
+    """
+    Submit a batch to the parse pool. Without a pool, or if the pool is
+    broken, the batch is parsed in-process and returned as a finished future.
+    """
+    if cpu is not None:
+        try:
+            return cpu.submit(_parse_batch, batch)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            logging.getLogger("scraper").error(
+                "Parse pool unavailable, parsing %d pages in-process: %s",
+                len(batch),
+                exc,
+            )
+    future: Future = Future()
+    future.set_result(_parse_batch(batch))
+    return future
+
+def _batch_records(
+    future: Future,
+    batch: List[Tuple[str, str]],
+    targets: Dict[str, List[str]],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one record per input URL behind each parsed page.
+    """
+    logger = logging.getLogger("scraper")
+    try:
+        users: List[Optional[TikTokUser]] = future.result()
+    except Exception as exc:
+        # e.g. a worker died and broke the pool; don't lose the batch over it.
+        logger.error(
+            "Parse worker failed, parsing %d pages in-process: %s", len(batch), exc
+        )
+        users = _parse_batch(batch)
+    for user in users:
+        if user is None:
+            continue
+        for url in targets.get(user.url, [user.url]):
+            record = user.to_dict()
+            record["url"] = url
+            yield record
+
+def iter_users(
     urls: List[str],
     config: Dict[str, Any],
-) -> List[Dict[str, Any]]:
+) -> Iterator[Dict[str, Any]]:
+    """
+    Scrape ``urls`` and yield each user record as soon as it is parsed, so
+    exporters can stream results instead of holding them all in memory.
+
+    Runs with more than PARSE_BATCH_SIZE unique profiles parse in a process
+    pool (unless ``parse_processes`` is false in the config). Its workers are
+    started with forkserver/spawn, which re-imports the caller's ``__main__``
+    module, so scripts calling this (or scrape_users) must guard their
+    top-level code with ``if __name__ == "__main__":``.
+    """
     logger = logging.getLogger("scraper")
 
     if not urls:
         logger.warning("No URLs to process.")
-        return []
+        return
 
     max_workers = int(config.get("max_workers", 5))
     request_timeout = int(config.get("request_timeout", 10))
     retry_attempts = int(config.get("retry_attempts", 1))
 
-    session = create_http_session()
+    # Profile and video URLs of the same author yield the same user, so each
+    # author's profile page is fetched once and the result is reused for all
+    # of their input URLs.
+    targets: Dict[str, List[str]] = {}
+    for url in urls:
+        targets.setdefault(profile_url_for(url), []).append(url)
+    logger.info("Fetching %d unique profiles for %d URLs", len(targets), len(urls))
+
+    batch_size = min(PARSE_BATCH_SIZE, max(1, len(targets) // max_workers))
+    # Starting worker processes only pays off once there are several batches;
+    # smaller runs parse on this thread.
+    use_processes = bool(config.get("parse_processes", True)) and (
+        len(targets) > PARSE_BATCH_SIZE
+    )
+    # No point starting more parse processes than there will be batches.
+    parse_workers = min(os.cpu_count() or 1, math.ceil(len(targets) / batch_size))
 
-    results: List[Dict[str, Any]] = []
-    futures = []
+    scraped = 0
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for url in urls:
-            future = executor.submit(
-                parse_user_from_url,
+    # Network I/O runs on threads; parsing is CPU-bound, so fetched pages are
+    # batched off to a process pool where it is not serialized by the GIL.
+    # The run gets its own connection pool, sized and retried per this config
+    # and closed when the run ends, rather than the process-wide default one.
+    with (
+        create_pool_manager(max_workers=max_workers, retries=retry_attempts) as session,
+        (
+            ProcessPoolExecutor(
+                max_workers=parse_workers,
+                mp_context=_parse_context(),
+                initializer=setup_logging,
+                initargs=(logging.getLogger().isEnabledFor(logging.DEBUG),),
+            )
+            if use_processes
+            else nullcontext()
+        ) as cpu,
+        ThreadPoolExecutor(max_workers=max_workers) as net,
+    ):
+        fetches = {
+            net.submit(
+                fetch_html,
                 url=url,
                 session=session,
                 timeout=request_timeout,
                 retries=retry_attempts,
-            )
-            futures.append(future)
+            ): url
+            for url in targets
+        }
 
-        for future in as_completed(futures):
+        parses: Dict[Future, List[Tuple[str, str]]] = {}
+        batch: List[Tuple[str, str]] = []
+        for future in as_completed(fetches):
+            url = fetches[future]
             try:
-                user: Optional[TikTokUser] = future.result()
-                if user is not None:
-                    results.append(user.to_dict())
+                batch.append((url, future.result()))
             except Exception as exc:
-                logger.error("Unexpected error while scraping a URL: %s", exc)
+                logger.error("Unexpected error while scraping %s: %s", url, exc)
+            if len(batch) >= batch_size:
+                parses[_submit_parse(cpu, batch)] = batch
+                batch = []
+
+            # Hand back whatever has finished parsing while fetches continue.
+            for parse in [parse for parse in parses if parse.done()]:
+                for record in _batch_records(parse, parses.pop(parse), targets):
+                    scraped += 1
+                    yield record
+
+        if batch:
+            parses[_submit_parse(cpu, batch)] = batch
+        for parse in as_completed(parses):
+            for record in _batch_records(parse, parses[parse], targets):
+                scraped += 1
+                yield record
 
-    logger.info("Successfully scraped %d/%d URLs", len(results), len(urls))
-    return results
+    logger.info("Successfully scraped %d/%d URLs", scraped, len(urls))
+    if not scraped:
+        logger.warning("No data scraped; output file will contain an empty list.")
+
+def scrape_users(
+    urls: List[str],
+    config: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """
+    List-returning wrapper around iter_users (see it for the __main__ guard
+    needed on large runs).
+    """
+    return list(iter_users(urls, config))
 
 def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -163,18 +322,16 @@ def main() -> None:
         sys.exit(1)
 
     logger.info("Starting TikTok user scraping for %d URLs", len(urls))
-    data = scrape_users(urls, config)
-
-    if not data:
-        logger.warning("No data scraped; output file will contain an empty list.")
 
-    export_data(
-        records=data,
+    # Records are handed to the exporter as they are scraped rather than
+    # collected into a list first.
+    count = export_data(
+        records=iter_users(urls, config),
         output_path=args.output,
         output_format=config.get("output_format"),
     )
 
-    logger.info("All done. Wrote %d records to %s", len(data), args.output)
+    logger.info("All done. Wrote %d records to %s", count, args.output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file